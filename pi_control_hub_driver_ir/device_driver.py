@@ -14,25 +14,69 @@
    limitations under the License.
 """
 
-import json
+import asyncio
+import operator
 import os
-from typing import List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 from uuid import UUID, uuid4
 
+import aiofiles
+import aiofiles.os
+import lirc
 import piir
 from pi_control_hub_driver_api import (AuthenticationMethod, DeviceCommand,
                                        DeviceDriver, DeviceDriverDescriptor,
                                        DeviceInfo, DeviceNotFoundException,
                                        DeviceDriverException)
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
 
 from pi_control_hub_driver_ir.icons import read_icon_for_key
+from pi_control_hub_driver_ir.lirc_client_pool import LircClientPool
+
+
+_REMOTE_EXTENSION = ".remote"
+
+__remote_definitions: Dict[str, Tuple[int, dict]] = {}
+
+
+async def _read_remote_definition(filepath: str) -> dict:
+    """Read and parse the remote definition without blocking the event loop.
+
+    Definitions are shared by all drivers of the process and kept in memory as long as the
+    file's modification time does not change. ``orjson`` is used to parse the file if it is
+    installed, otherwise the standard ``json`` module.
+    """
+    mtime = (await aiofiles.os.stat(filepath)).st_mtime_ns
+    if filepath in __remote_definitions:
+        cached_mtime, remote_definition = __remote_definitions[filepath]
+        if cached_mtime == mtime:
+            return remote_definition
+
+    async with aiofiles.open(filepath, mode="rb") as f:
+        content: bytes = await f.read()
+    remote_definition = _json_loads(content)
+    __remote_definitions[filepath] = (mtime, remote_definition)
+    return remote_definition
 
 
 class LircDeviceCommand(DeviceCommand):
-    def __init__(self, cmd_id: int, title: str, key: str, device_id: str):
+    __slots__ = ("_pool", "_executor", "_send")
+
+    def __init__(self,
+                 cmd_id: int,
+                 title: str,
+                 key: str,
+                 device_id: str,
+                 pool: LircClientPool,
+                 executor: ThreadPoolExecutor):
         DeviceCommand.__init__(self, cmd_id, title, read_icon_for_key(key))
-        self._key = key
-        self._device_id = device_id
+        self._pool = pool
+        self._executor = executor
+        self._send = operator.methodcaller("send_once", device_id, key)
 
     async def execute(self):
         """
@@ -42,27 +86,51 @@ class LircDeviceCommand(DeviceCommand):
         ------
         `DeviceCommandException` in case of an error while executing the command.
         """
+        if not self._pool.is_alive:
+            return
         try:
-            lirc_client = lirc.Client()
-            lirc_client.send_once(self._device_id, self._key)
-            lirc_client.close()
-        except lirc.exceptions.LircdConnectionError:
+            await self._pool.send(self._send, self._executor)
+        except (lirc.exceptions.LircdConnectionError, lirc.exceptions.LircdSocketError, OSError):
             pass
 
 class LircDeviceDriver(DeviceDriver):
-    def __init__(self, device_info: DeviceInfo):
+    __slots__ = ("_pool", "_executor", "_commands_cache", "_filepath", "_remote_definition",
+                 "_remote_layout_size", "_remote_layout", "_load_lock")
+
+    def __init__(self,
+                 device_info: DeviceInfo,
+                 remote_defition_path: str,
+                 pool: LircClientPool,
+                 executor: ThreadPoolExecutor):
         DeviceDriver.__init__(self, device_info)
-        try:
-            remote_defition_path = os.path.join(
-                DeviceDriverDescriptor.get_config_path(),
-                "pi_control_hub_driver_ir"
-            )
-            filepath = os.path.join(remote_defition_path, device_info.device_id)
-            with open(filepath, encoding="utf-8") as f:
-                content: str = f.read()
-                self._remote_definition = json.loads(content)
-        except Exception as ex:
-            raise DeviceDriverException("Error while reading the remote definition", ex) from ex
+        self._pool = pool
+        self._executor = executor
+        self._commands_cache: Optional[Tuple[DeviceCommand, ...]] = None
+        self._filepath = os.path.join(remote_defition_path, device_info.device_id)
+        self._remote_definition: Optional[dict] = None
+        self._remote_layout_size: Tuple[int, int] = (0, 0)
+        self._remote_layout: Tuple[Tuple[int, ...], ...] = ()
+        self._load_lock = asyncio.Lock()
+
+    async def _ensure_loaded(self):
+        """Read the remote definition once; concurrent callers wait for the same read.
+
+        Raises
+        ------
+        `DeviceDriverException` in case of an error.
+        """
+        if self._remote_definition is not None:
+            return
+        async with self._load_lock:
+            if self._remote_definition is None:
+                try:
+                    remote_definition = await _read_remote_definition(self._filepath)
+                    remote = remote_definition["remote"]
+                    self._remote_layout_size = (remote["width"], remote["height"])
+                    self._remote_layout = tuple(tuple(column) for column in remote["layout"])
+                except Exception as ex:
+                    raise DeviceDriverException("Error while reading the remote definition", ex) from ex
+                self._remote_definition = remote_definition
 
     async def get_commands(self) -> List[DeviceCommand]:
         """Return the commands that are supported by this device.
@@ -75,11 +143,18 @@ class LircDeviceDriver(DeviceDriver):
         ------
         `DeviceDriverException` in case of an error.
         """
-        keys = self._remote_definition["keys"]
-        commands = []
-        for i, key in enumerate(sorted(list(keys.keys()))):
-            commands.append(LircDeviceCommand(i, key, key, self.device_id))
-        return commands
+        if self._commands_cache is None:
+            await self._ensure_loaded()
+            keys = self._remote_definition["keys"]
+            self._commands_cache = tuple(
+                LircDeviceCommand(i, key, key, self.device_id, self._pool, self._executor)
+                for i, key in enumerate(sorted(keys))
+            )
+        return list(self._commands_cache)
+
+    def _invalidate_commands(self):
+        """Drop the cached commands; they are rebuilt by the next call of ``get_commands``."""
+        self._commands_cache = None
 
     @property
     def remote_layout_size(self) -> Tuple[int, int]:
@@ -90,21 +165,18 @@ class LircDeviceDriver(DeviceDriver):
         -------
         A tuple with the width and height of the layout
         """
-        remote = self._remote_definition["remote"]
-        return remote["width"], remote["height"]
+        return self._remote_layout_size
 
     @property
-    def remote_layout(self) -> List[List[int]]:
+    def remote_layout(self) -> Tuple[Tuple[int, ...], ...]:
         """
         The layout of the remote.
 
         Returns
         -------
-        The layout as a list of columns.
+        The layout as a tuple of columns.
         """
-        remote = self._remote_definition["remote"]
-        layout = remote["layout"]
-        return []
+        return self._remote_layout
 
     async def execute(self, command: DeviceCommand):
         """
@@ -130,7 +202,11 @@ class LircDeviceDriver(DeviceDriver):
         -------
         true if the device is ready, otherwise false.
         """
-        return self._lirc_client is not None
+        try:
+            async with self._pool.acquire():
+                return True
+        except lirc.exceptions.LircdConnectionError:
+            return False
 
 
 class LircDeviceDriverDescriptor(DeviceDriverDescriptor):
@@ -147,23 +223,40 @@ class LircDeviceDriverDescriptor(DeviceDriverDescriptor):
         )
         if not os.path.isdir(self._remote_defition_path):
             self._remote_defition_path = None
+        self._lirc_client_pool = LircClientPool()
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="lirc")
+        self._device_cache: Dict[str, DeviceInfo] = {}
+        self._device_cache_mtime: Optional[int] = None
+
+    def _refresh_device_cache(self):
+        """Rescan the remote definitions if the directory has changed since the last scan."""
+        if self._remote_defition_path is None:
+            return
+        mtime = os.stat(self._remote_defition_path).st_mtime_ns
+        if mtime == self._device_cache_mtime:
+            return
+        with os.scandir(self._remote_defition_path) as entries:
+            self._device_cache = {
+                entry.name: DeviceInfo(entry.name[:-len(_REMOTE_EXTENSION)], entry.name)
+                for entry in entries
+                if len(entry.name) > len(_REMOTE_EXTENSION) and
+                entry.name.endswith(_REMOTE_EXTENSION) and
+                entry.is_file()
+            }
+        self._device_cache_mtime = mtime
 
     async def get_devices(self) -> List[DeviceInfo]:
         """Returns a list with the available device instances."""
-        if self._remote_defition_path is not None:
-            remotes = [f for f in os.listdir(self._remote_defition_path)
-                       if os.path.isfile(os.path.join(self._remote_defition_path, f)) and
-                       (len(os.path.splitext(f)) > 1) and
-                       os.path.splitext(f)[1] == ".remote"]
-            return list(map(lambda f: DeviceInfo(os.path.splitext(f)[0], f), remotes))
-        return []
+        self._refresh_device_cache()
+        return list(self._device_cache.values())
 
     async def get_device(self, device_id: str) -> DeviceInfo:
         """Gets the device with the given ID"""
-        devices = list(filter(lambda d: d.device_id == device_id, await self.get_devices()))
-        if len(devices) == 0:
-            raise DeviceNotFoundException(device_id=device_id)
-        return devices[0]
+        self._refresh_device_cache()
+        try:
+            return self._device_cache[device_id]
+        except KeyError:
+            raise DeviceNotFoundException(device_id=device_id) from None
 
     @property
     def authentication_method(self) -> AuthenticationMethod:
@@ -216,7 +309,13 @@ class LircDeviceDriverDescriptor(DeviceDriverDescriptor):
         -------
         The instance of the device driver or None in case of an error.
         """
-        return LircDeviceDriver(await self.get_device(device_id))
+        driver = LircDeviceDriver(
+            await self.get_device(device_id),
+            self._remote_defition_path,
+            self._lirc_client_pool,
+            self._executor)
+        await driver._ensure_loaded()
+        return driver
 
 
 def get_driver_descriptor() -> DeviceDriverDescriptor:
@@ -14,27 +14,22 @@
    limitations under the License.
 """
 
-import os
 import pathlib
+from typing import Dict, FrozenSet
 
 
 __directory = pathlib.Path(__file__).parent.resolve()
-__image_data = {}
 
-def __read_icon(filename: str) -> bytes:
-    filepath = os.path.join(__directory, filename)
-    if filepath in __image_data:
-        return __image_data[filepath]
+_AVAILABLE_KEYS: FrozenSet[str] = frozenset(p.stem for p in __directory.glob("*.png"))
 
-    with open(filepath, mode="rb") as f:
-        data: bytes = f.read()
-        __image_data[filepath] = data
-        return data
+def __read_icons() -> Dict[str, bytes]:
+    return {key: (__directory / f"{key}.png").read_bytes() for key in _AVAILABLE_KEYS}
 
-def unknown() -> bytes: return __read_icon("unknown.png")
+__icon_by_stem = __read_icons()
+
+def unknown() -> bytes: return __icon_by_stem["unknown"]
 
 def read_icon_for_key(key: str) -> bytes:
-    filepath = os.path.join(__directory, key) + ".png"
-    if not pathlib.Path(filepath).is_file():
+    if key not in _AVAILABLE_KEYS:
         return unknown()
-    return __read_icon(key + ".png")
+    return __icon_by_stem[key]
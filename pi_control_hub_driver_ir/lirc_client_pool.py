@@ -0,0 +1,210 @@
+"""
+   Copyright 2024 Thomas Bonk
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+"""
+
+import asyncio
+import time
+from concurrent.futures import Executor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Optional, Tuple
+
+import lirc
+
+
+_STALE_CONNECTION_ERRORS = (OSError, lirc.exceptions.LircdSocketError)
+
+
+class LircClientPool:
+    """A pool of connections to lircd that are shared by all device drivers.
+
+    Parameters
+    ----------
+    size : int
+        The maximum number of connections that are open at the same time.
+    max_idle_time : float
+        The number of seconds after which an idle connection is closed.
+    probe_interval : float
+        The number of seconds between reconnection attempts while lircd is unreachable.
+    """
+
+    def __init__(self, size: int = 4, max_idle_time: float = 10.0, probe_interval: float = 1.0):
+        self._max_idle_time = max_idle_time
+        self._probe_interval = probe_interval
+        self._slots = asyncio.Semaphore(size)
+        self._idle: asyncio.Queue[Tuple[lirc.Client, float]] = asyncio.Queue(maxsize=size)
+        self._reaper: Optional[asyncio.Task] = None
+        self._probe: Optional[asyncio.Task] = None
+        self._alive = True
+
+    @property
+    def is_alive(self) -> bool:
+        """
+        A flag that determines whether lircd is reachable.
+
+        Returns
+        -------
+        false after a connection to lircd failed, until a background probe reconnected.
+        """
+        return self._alive
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[lirc.Client]:
+        """Check out a connection to lircd.
+
+        The connection is returned to the pool when the context is left normally or by a
+        ``LircdCommandFailureError``, since lircd's reply has then been read completely. On any
+        other exception the connection is closed and evicted from the pool instead: it may hold
+        unread reply lines, be broken, or (e.g. after a cancellation) still be in use by a send
+        that runs in another thread.
+
+        Raises
+        ------
+        `LircdConnectionError` if no connection to lircd can be opened.
+        """
+        async with self._lease() as (client, _):
+            yield client
+
+    async def send(self, call: Callable[[lirc.Client], Any], executor: Optional[Executor] = None):
+        """Run ``call`` with a pooled connection in ``executor``.
+
+        A connection that was idle in the pool may have gone stale, e.g. because lircd was
+        restarted. If ``call`` fails on such a connection with an ``OSError`` (including
+        ``TimeoutError``) or a ``LircdSocketError``, all idle connections are evicted and
+        ``call`` is retried once on a fresh connection.
+
+        Parameters
+        ----------
+        call : Callable[[lirc.Client], Any]
+            The function that is called with the connection.
+        executor : Optional[Executor]
+            The executor that runs ``call``; the loop's default executor if omitted.
+
+        Raises
+        ------
+        `LircdConnectionError` if no connection to lircd can be opened, or the error of
+        ``call`` on a fresh connection.
+        """
+        loop = asyncio.get_running_loop()
+        reused = False
+        try:
+            async with self._lease() as (client, reused):
+                return await loop.run_in_executor(executor, call, client)
+        except _STALE_CONNECTION_ERRORS:
+            if not reused:
+                raise
+        self._evict_idle()
+        async with self._lease(fresh=True) as (client, _):
+            return await loop.run_in_executor(executor, call, client)
+
+    @asynccontextmanager
+    async def _lease(self, fresh: bool = False) -> AsyncIterator[Tuple[lirc.Client, bool]]:
+        async with self._slots:
+            reused = not fresh and not self._idle.empty()
+            try:
+                client = self._checkout() if reused else lirc.Client()
+            except lirc.exceptions.LircdConnectionError:
+                self._mark_dead()
+                raise
+            reusable = True
+            lircd_failed = False
+            try:
+                yield client, reused
+            except lirc.exceptions.LircdCommandFailureError:
+                raise
+            except (lirc.exceptions.LircdConnectionError, *_STALE_CONNECTION_ERRORS):
+                reusable = False
+                lircd_failed = not reused
+                raise
+            except BaseException:
+                reusable = False
+                raise
+            finally:
+                if reusable:
+                    self.release(client)
+                else:
+                    self._evict(client)
+                if lircd_failed:
+                    self._mark_dead()
+
+    def release(self, client: lirc.Client):
+        """Return a connection to the pool.
+
+        Parameters
+        ----------
+        client : lirc.Client
+            The connection that has been checked out with ``acquire``.
+        """
+        try:
+            self._idle.put_nowait((client, time.monotonic()))
+        except asyncio.QueueFull:
+            self._evict(client)
+            return
+        self._start_reaper()
+
+    def close(self):
+        """Close all idle connections and stop the background tasks."""
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        if self._probe is not None:
+            self._probe.cancel()
+            self._probe = None
+        self._evict_idle()
+
+    def _checkout(self) -> lirc.Client:
+        client, _ = self._idle.get_nowait()
+        return client
+
+    def _evict_idle(self):
+        while not self._idle.empty():
+            client, _ = self._idle.get_nowait()
+            self._evict(client)
+
+    def _evict(self, client: lirc.Client):
+        try:
+            client.close()
+        except lirc.exceptions.LircError:
+            pass
+
+    def _mark_dead(self):
+        self._alive = False
+        if self._probe is None or self._probe.done():
+            self._probe = asyncio.get_running_loop().create_task(self._probe_lircd())
+
+    async def _probe_lircd(self):
+        while True:
+            await asyncio.sleep(self._probe_interval)
+            try:
+                client = lirc.Client()
+            except lirc.exceptions.LircdConnectionError:
+                continue
+            self.release(client)
+            self._alive = True
+            return
+
+    def _start_reaper(self):
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.get_running_loop().create_task(self._reap())
+
+    async def _reap(self):
+        while not self._idle.empty():
+            await asyncio.sleep(self._max_idle_time)
+            deadline = time.monotonic() - self._max_idle_time
+            for _ in range(self._idle.qsize()):
+                client, released_at = self._idle.get_nowait()
+                if released_at < deadline:
+                    self._evict(client)
+                else:
+                    self._idle.put_nowait((client, released_at))
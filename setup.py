@@ -26,13 +26,16 @@ setup(
     author=__author__,
     author_email=__author_email__,
     license='Apache 2.0',
-    packages=find_packages(),
+    packages=find_packages(exclude=["tests", "tests.*"]),
     package_data={
         "pi_control_hub_driver_ir.icons": ["*.png"]
     },
     install_requires=[
         'pi_control_hub_driver_api @ git+https://github.com/PiControl/pi_control_hub_driver_api.git@main#egg=pi_control_hub_driver_api',
-        'PiIR>=0.2.5'
+        'PiIR>=0.2.5',
+        'lirc>=3.1.0',
+        'orjson',
+        'aiofiles'
     ],
     entry_points={
         "pi_control_hub_driver": [
@@ -0,0 +1,163 @@
+"""
+   Copyright 2024 Thomas Bonk
+
+   Licensed under the Apache License, Version 2.0 (the "License");
+   you may not use this file except in compliance with the License.
+   You may obtain a copy of the License at
+
+       http://www.apache.org/licenses/LICENSE-2.0
+
+   Unless required by applicable law or agreed to in writing, software
+   distributed under the License is distributed on an "AS IS" BASIS,
+   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+   See the License for the specific language governing permissions and
+   limitations under the License.
+"""
+
+import asyncio
+import operator
+import unittest
+from typing import List
+from unittest import mock
+
+import lirc
+
+from pi_control_hub_driver_ir.lirc_client_pool import LircClientPool
+
+
+class FakeClient:
+    instances: List["FakeClient"] = []
+    connect_error = None
+
+    def __init__(self):
+        if FakeClient.connect_error is not None:
+            raise FakeClient.connect_error
+        self.closed = False
+        self.send_error = None
+        self.sent = []
+        FakeClient.instances.append(self)
+
+    def send_once(self, remote: str, key: str):
+        if self.send_error is not None:
+            raise self.send_error
+        self.sent.append((remote, key))
+
+    def close(self):
+        self.closed = True
+
+
+SEND_OK = operator.methodcaller("send_once", "tv", "KEY_OK")
+
+
+class LircClientPoolTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        FakeClient.instances = []
+        FakeClient.connect_error = None
+        patcher = mock.patch("lirc.Client", FakeClient)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.pool = LircClientPool(size=2, max_idle_time=0.05, probe_interval=0.01)
+        self.addCleanup(self.pool.close)
+
+    async def test_released_connection_is_reused(self):
+        async with self.pool.acquire() as first:
+            pass
+        async with self.pool.acquire() as second:
+            pass
+        self.assertIs(first, second)
+        self.assertFalse(first.closed)
+
+    async def test_concurrent_checkouts_are_bounded_by_size(self):
+        async def use():
+            async with self.pool.acquire():
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*[use() for _ in range(6)])
+        self.assertEqual(len(FakeClient.instances), 2)
+
+    async def test_socket_error_evicts_connection_and_marks_lircd_dead(self):
+        with self.assertRaises(lirc.exceptions.LircdSocketError):
+            async with self.pool.acquire() as client:
+                raise lirc.exceptions.LircdSocketError()
+        self.assertTrue(client.closed)
+        self.assertFalse(self.pool.is_alive)
+
+    async def test_invalid_reply_evicts_connection(self):
+        with self.assertRaises(lirc.exceptions.LircdInvalidReplyPacketError):
+            async with self.pool.acquire() as client:
+                raise lirc.exceptions.LircdInvalidReplyPacketError()
+        self.assertTrue(client.closed)
+        self.assertTrue(self.pool.is_alive)
+
+    async def test_command_failure_keeps_connection(self):
+        with self.assertRaises(lirc.exceptions.LircdCommandFailureError):
+            async with self.pool.acquire() as client:
+                raise lirc.exceptions.LircdCommandFailureError()
+        async with self.pool.acquire() as again:
+            pass
+        self.assertIs(client, again)
+        self.assertFalse(client.closed)
+
+    async def test_cancelled_send_evicts_connection(self):
+        started = asyncio.Event()
+
+        async def use():
+            async with self.pool.acquire():
+                started.set()
+                await asyncio.sleep(1)
+
+        task = asyncio.ensure_future(use())
+        await started.wait()
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertTrue(FakeClient.instances[0].closed)
+        self.assertTrue(self.pool.is_alive)
+
+    async def test_send_retries_stale_connection_once(self):
+        await self.pool.send(SEND_OK)
+        stale = FakeClient.instances[0]
+        stale.send_error = BrokenPipeError(32, "Broken pipe")
+
+        await self.pool.send(SEND_OK)
+
+        self.assertTrue(stale.closed)
+        self.assertEqual(len(FakeClient.instances), 2)
+        self.assertEqual(FakeClient.instances[1].sent, [("tv", "KEY_OK")])
+        self.assertTrue(self.pool.is_alive)
+
+    async def test_send_does_not_retry_fresh_connection(self):
+        def fail(client: FakeClient):
+            raise TimeoutError()
+
+        with self.assertRaises(TimeoutError):
+            await self.pool.send(fail)
+        self.assertEqual(len(FakeClient.instances), 1)
+        self.assertTrue(FakeClient.instances[0].closed)
+        self.assertFalse(self.pool.is_alive)
+
+    async def test_reaper_closes_idle_connections_and_stops(self):
+        async with self.pool.acquire() as client:
+            pass
+        await asyncio.sleep(0.2)
+        self.assertTrue(client.closed)
+        self.assertTrue(self.pool._reaper.done())
+
+        async with self.pool.acquire() as fresh:
+            pass
+        self.assertIsNot(client, fresh)
+
+    async def test_probe_restores_liveness(self):
+        FakeClient.connect_error = lirc.exceptions.LircdConnectionError()
+        with self.assertRaises(lirc.exceptions.LircdConnectionError):
+            async with self.pool.acquire():
+                pass
+        self.assertFalse(self.pool.is_alive)
+
+        FakeClient.connect_error = None
+        await asyncio.sleep(0.05)
+        self.assertTrue(self.pool.is_alive)
+
+
+if __name__ == "__main__":
+    unittest.main()